@@ -15,6 +15,7 @@
 from __future__ import print_function
 
 from ducktape.command_line.defaults import ConsoleDefaults
+from ducktape.tests.scheduler import LARGEST_FIRST, SCHEDULER_POLICIES
 from ducktape.utils.util import ducktape_version
 
 import argparse
@@ -87,6 +88,11 @@ def create_ducktape_parser():
                              "or if @cluster annotation is empty. "
                              "You can still specify 0-sized cluster explicitly using either num_nodes=0 "
                              "or cluster_spec=ClusterSpec.empty()")
+    parser.add_argument("--scheduler-policy", action="store", choices=SCHEDULER_POLICIES, default=LARGEST_FIRST,
+                        help="How to pick the next test to run when several fit in the available nodes. "
+                             "'largest' runs the largest test that fits. 'bestfit' also runs the largest test "
+                             "that fits, but among equally sized tests prefers the one whose node types best match "
+                             "the available nodes.")
     parser.add_argument("--test-runner-timeout", action="store", type=int, default=1800000,
                         help="Amount of time in milliseconds between test communicating between the test runner"
                              " before a timeout error occurs. Default is 30 minutes")
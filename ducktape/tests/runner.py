@@ -115,7 +115,7 @@ class TestRunner(object):
         self.exit_first = self.session_context.exit_first
 
         self.main_process_pid = os.getpid()
-        self.scheduler = TestScheduler(tests, self.cluster)
+        self.scheduler = TestScheduler(tests, self.cluster, session_context.scheduler_policy)
 
         self.test_counter = 1
         self.total_tests = len(self.scheduler)
@@ -183,9 +183,13 @@ class TestRunner(object):
     @property
     def _ready_to_trigger_more_tests(self):
         """Should we pull another test from the scheduler?"""
-        return not self.stop_testing and \
-            len(self.active_tests) < self.max_parallel and \
-            self.scheduler.peek() is not None
+        return self._next_test_to_trigger() is not None
+
+    def _next_test_to_trigger(self):
+        """Return the test we should pull from the scheduler next, or None if we shouldn't pull another test."""
+        if self.stop_testing or len(self.active_tests) >= self.max_parallel:
+            return None
+        return self.scheduler.peek()
 
     @property
     def _expect_client_requests(self):
@@ -232,10 +236,11 @@ class TestRunner(object):
         # Run the tests!
         self._log(logging.INFO, "starting test run with session id %s..." % self.session_context.session_id)
         self._log(logging.INFO, "running %d tests..." % len(self.scheduler))
-        while self._ready_to_trigger_more_tests or self._expect_client_requests:
+        # peek at the scheduler once per scheduling step, and trigger the test that was peeked at
+        next_test_context = self._next_test_to_trigger()
+        while next_test_context is not None or self._expect_client_requests:
             try:
-                while self._ready_to_trigger_more_tests:
-                    next_test_context = self.scheduler.peek()
+                while next_test_context is not None:
                     try:
                         self._preallocate_subcluster(next_test_context)
                     except InsufficientResourcesError:
@@ -255,6 +260,7 @@ class TestRunner(object):
                         # only remove the test from the scheduler once we've successfully allocated a subcluster for it
                         self.scheduler.remove(next_test_context)
                         self._run_single_test(next_test_context)
+                    next_test_context = self._next_test_to_trigger()
 
                 if self._expect_client_requests:
                     try:
@@ -270,11 +276,15 @@ class TestRunner(object):
                             self._terminate_process(proc)
                         self._client_procs = {}
                         raise
+
+                    # a test may have finished and freed its nodes, so look at the scheduler again
+                    next_test_context = self._next_test_to_trigger()
             except KeyboardInterrupt:
                 # If SIGINT is received, stop triggering new tests, and let the currently running tests finish
                 self._log(logging.INFO,
                           "Received KeyboardInterrupt. Now waiting for currently running tests to finish...")
                 self.stop_testing = True
+                next_test_context = None
 
         # All clients should be cleaned up in their finish block
         if self._client_procs:
@@ -12,29 +12,47 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import bisect
+
+# offer up the largest cluster user which fits, in the order the tests were given
+LARGEST_FIRST = "largest"
+
+# offer up the largest cluster user which fits, preferring among equally sized tests the one whose node types
+# are best aligned with the available nodes, so that the remaining nodes stay usable by other tests
+BEST_FIT = "bestfit"
+
+SCHEDULER_POLICIES = [LARGEST_FIRST, BEST_FIT]
+
 
 class TestScheduler(object):
     """This class tracks tests which are scheduled to run, and provides an ordering based on the current cluster state.
 
-    The ordering is "on-demand"; calling next returns the largest cluster user which fits in the currently
-    available cluster nodes.
+    The ordering is "on-demand"; calling peek returns the largest cluster user which fits in the currently
+    available cluster nodes, which stays in the scheduler until it is removed. With the best-fit policy, ties between
+    equally sized tests are broken by how well their node types line up with the available nodes.
     """
 
-    def __init__(self, test_contexts, cluster):
+    def __init__(self, test_contexts, cluster, policy=LARGEST_FIRST):
         self.cluster = cluster
+        if policy not in SCHEDULER_POLICIES:
+            raise RuntimeError("Unsupported scheduler policy %s" % policy)
+        self.policy = policy
 
         # Track tests which would never be offered up by the scheduling algorithm due to insufficient
         # cluster resources
         self._test_context_list = test_contexts.copy()
 
+        # rank of each module and class by where its first test was given, which orders equally sized tests;
+        # taken from the original order once, since later rebuilds start from the already sorted list
+        self._group_ranks = {}
+        for tc in self._test_context_list:
+            self._group_ranks.setdefault((tc.module_name, tc.cls_name), len(self._group_ranks))
+
         self._sort_test_context_list()
 
     def __len__(self):
         """Number of tests currently in the scheduler"""
-        return len(self._test_context_list)
-
-    def __iter__(self):
-        return self
+        return len(self._test_context_list) - self._num_removed
 
     def filter_unschedulable_tests(self):
         """
@@ -42,42 +60,190 @@ class TestScheduler(object):
         this scheduler and return them.
         """
         all = self.cluster.all()
+        num_nodes = all.size()
+        schedulable = []
+        neg_sizes = []
         unschedulable = []
-        for test_context in self._test_context_list:
-            if not all.nodes.can_remove_spec(test_context.expected_cluster_spec):
+        for test_context in self._live_test_contexts():
+            # look the spec up once, both to check it and to size the test for the index
+            cluster_spec = test_context.expected_cluster_spec
+            if cluster_spec is not None and len(cluster_spec) <= num_nodes and \
+                    all.nodes.can_remove_spec(cluster_spec):
+                schedulable.append(test_context)
+                neg_sizes.append(-len(cluster_spec))
+            else:
                 unschedulable.append(test_context)
-        for u in unschedulable:
-            self._test_context_list.remove(u)
+
+        # the cluster may have shrunk since the index was built, which changes the size of tests that claim
+        # the whole cluster, so rebuild it from scratch
+        self._test_context_list = schedulable
+        self._sort_test_context_list(neg_sizes)
         return unschedulable
 
-    def _sort_test_context_list(self):
-        """Replace self.test_context_list with a sorted shallow copy
+    def _live_test_contexts(self):
+        return (tc for tc in self._test_context_list if tc is not None)
+
+    def _sort_test_context_list(self, neg_sizes=None):
+        """Replace self.test_context_list with a sorted shallow copy, and rebuild the size index
 
-        Sort from largest cluster users to smallest
+        Sort from largest cluster users to smallest. Among equally sized tests, those from the same module and class
+        are kept next to each other, so that they tend to run back to back; otherwise the original order is kept.
+
+        :param neg_sizes: negated expected_num_nodes of each test in self.test_context_list,
+            if the caller has already looked them up
+        """
+        # look up each test's size only once, and sort the positions by negated size, then by the rank of the test's
+        # module and class; the sort is stable, so the original order is kept within a group
+        if neg_sizes is None:
+            neg_sizes = [-tc.expected_num_nodes for tc in self._test_context_list]
+        keys = [(neg_size, self._group_ranks[tc.module_name, tc.cls_name])
+                for neg_size, tc in zip(neg_sizes, self._test_context_list)]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._test_context_list = [self._test_context_list[i] for i in order]
+
+        # negated sizes parallel to self._test_context_list, i.e. in ascending order, so that bisect can locate
+        # the largest tests which fit in a given number of nodes
+        self._neg_sizes = [neg_sizes[i] for i in order]
+        self._reset_positions()
+
+        # tests without cluster use metadata claim the whole cluster, so the sizes above only hold for this cluster size
+        self._cluster_size = len(self.cluster)
+
+    def _resort_if_cluster_resized(self):
+        """Sort the remaining tests again if the cluster has changed size since they were sorted.
+
+        The cluster can lose nodes which fail their health check while being allocated, outside of
+        filter_unschedulable_tests(), which leaves the sizes in the index stale for tests claiming the whole cluster.
         """
-        # sort from the largest cluster users to smallest
-        self._test_context_list = sorted(
-            self._test_context_list,
-            key=lambda tc: tc.expected_num_nodes,
-            reverse=True
-        )
-
-    def peek(self):
+        if len(self.cluster) != self._cluster_size:
+            self._test_context_list = list(self._live_test_contexts())
+            self._sort_test_context_list()
+
+    def _compact(self):
+        """Drop the slots of removed tests from the sorted list and the size index"""
+        live = [i for i, tc in enumerate(self._test_context_list) if tc is not None]
+        self._test_context_list = [self._test_context_list[i] for i in live]
+        self._neg_sizes = [self._neg_sizes[i] for i in live]
+        self._reset_positions()
+
+    def _reset_positions(self):
+        """Recompute the positions tracked in self._test_context_list, which must not contain removed tests"""
+        # removed tests are replaced by None and compacted away lazily, see remove()
+        self._num_removed = 0
+
+        # position of the first test which hasn't been removed
+        self._head = 0
+
+        # position of the first test which hasn't been removed among those of each (negated) size
+        self._size_heads = {}
+        for i, neg_size in enumerate(self._neg_sizes):
+            self._size_heads.setdefault(neg_size, i)
+
+        # position of the test returned by the last call to peek(), or -1
+        self._peeked_index = -1
+
+    def peek(self, available=None):
         """Locate and return the next object to be scheduled, without removing it internally.
 
+        :param available: ClusterSpec describing the currently available nodes, if the caller already has it.
+            Defaults to querying the cluster, which is done only once per call.
         :return test_context for the next test to be scheduled.
             If scheduler is empty, or no test can currently be scheduled, return None.
         """
-        for tc in self._test_context_list:
-            if self.cluster.available().nodes.can_remove_spec(tc.expected_cluster_spec):
-                return tc
+        # remember where the test is, so that removing it right after peeking doesn't have to look it up again
+        self._peeked_index = self._peek_index(available)
+        return self._test_context_list[self._peeked_index] if self._peeked_index >= 0 else None
+
+    def _peek_index(self, available=None):
+        """Return the position of the next test to be scheduled in self._test_context_list, or -1 if there is none"""
+        self._resort_if_cluster_resized()
+        if available is None:
+            available = self.cluster.available()
+
+        start = self._head
+        if self.policy == LARGEST_FIRST and start < len(self._test_context_list):
+            # on a mostly idle cluster the largest remaining test usually fits, so check it before searching
+            if available.nodes.can_remove_spec(self._test_context_list[start].expected_cluster_spec):
+                return start
+            start += 1
+
+        # tests which need more nodes than are available can't fit, so skip straight past them
+        # (the largest tests tend to be removed first, so don't walk over their slots either)
+        start = max(start, bisect.bisect_left(self._neg_sizes, -available.size()))
+        if start < len(self._neg_sizes):
+            # and past the removed tests at the front of the largest size which fits
+            start = max(start, self._size_heads[self._neg_sizes[start]])
+        if self.policy == BEST_FIT:
+            return self._peek_best_fit_index(available, start)
+
+        for i in range(start, len(self._test_context_list)):
+            tc = self._test_context_list[i]
+            if tc is not None and available.nodes.can_remove_spec(tc.expected_cluster_spec):
+                return i
 
-        return None
+        return -1
+
+    def _peek_best_fit_index(self, available, start):
+        """Among the largest tests which fit, return the position of the one whose nodes best line up with the
+        available nodes.
+
+        Alignment is the dot product of the number of requested and available nodes per operating system, so that
+        tests are steered towards the node types which are plentiful, rather than draining the scarce ones.
+        """
+        best = -1
+        best_score = -1
+        for i in range(start, len(self._test_context_list)):
+            tc = self._test_context_list[i]
+            if tc is None:
+                continue
+            if best >= 0 and self._neg_sizes[i] != self._neg_sizes[best]:
+                # tests are sorted by size, so all remaining tests are smaller than the best one found so far
+                break
+            cluster_spec = tc.expected_cluster_spec
+            if available.nodes.can_remove_spec(cluster_spec):
+                score = sum(len(node_specs) * len(available.nodes.os_to_nodes.get(os, []))
+                            for os, node_specs in cluster_spec.nodes.os_to_nodes.items())
+                if score > best_score:
+                    best = i
+                    best_score = score
+
+        return best
 
     def remove(self, tc):
         """Remove test context object from this scheduler.
         Intended usage is to peek() first, then perform whatever validity checks,
         and if they pass, remove() it from the scheduler.
         """
-        if tc:
-            self._test_context_list.remove(tc)
+        if not tc:
+            return
+
+        i = self._peeked_index
+        if i < 0 or self._test_context_list[i] is not tc:
+            # the index is searched by the test's current size
+            self._resort_if_cluster_resized()
+            i = self._index_of(tc)
+
+        self._test_context_list[i] = None
+        self._num_removed += 1
+        neg_size = self._neg_sizes[i]
+        if self._size_heads[neg_size] == i:
+            j = i + 1
+            while j < len(self._test_context_list) and self._test_context_list[j] is None and \
+                    self._neg_sizes[j] == neg_size:
+                j += 1
+            self._size_heads[neg_size] = j
+        while self._head < len(self._test_context_list) and self._test_context_list[self._head] is None:
+            self._head += 1
+        if 2 * self._num_removed > len(self._test_context_list):
+            self._compact()
+
+    def _index_of(self, tc):
+        """Return the position of the given test context in self._test_context_list"""
+        neg_size = -tc.expected_num_nodes
+        lo = bisect.bisect_left(self._neg_sizes, neg_size)
+        hi = bisect.bisect_right(self._neg_sizes, neg_size, lo)
+        for i in range(lo, hi):
+            if self._test_context_list[i] is tc:
+                return i
+
+        raise ValueError("%s is not in the scheduler" % str(tc))
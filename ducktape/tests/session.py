@@ -19,6 +19,7 @@ import time
 
 from ducktape.tests.loggermaker import LoggerMaker
 from ducktape.command_line.defaults import ConsoleDefaults
+from ducktape.tests.scheduler import LARGEST_FIRST
 
 
 class SessionContext(object):
@@ -40,6 +41,7 @@ class SessionContext(object):
         self.fail_bad_cluster_utilization = kwargs.get("fail_bad_cluster_utilization")
         self.fail_greedy_tests = kwargs.get("fail_greedy_tests", False)
         self.test_runner_timeout = kwargs.get("test_runner_timeout")
+        self.scheduler_policy = kwargs.get("scheduler_policy", LARGEST_FIRST)
         self._globals = kwargs.get("globals")
 
     @property
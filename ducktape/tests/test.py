@@ -195,18 +195,34 @@ def _compress_cmd(log_path):
     return compres_cmd
 
 
+# deletes the ASCII characters which regular expressions treat as whitespace
+_ASCII_WHITESPACE_TABLE = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if c.isspace()))
+
+# any character outside of ASCII (str.isascii is only available from python 3.7)
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7f]")
+
+# runs of whitespace, dots and other characters which are not allowed in a path name
+_SEPARATOR_RE = re.compile(r"[^\-=_\w]+")
+
+
+def _separator(match):
+    # whitespace alone is dropped, any other run becomes a single dot
+    return "" if match.group().isspace() else "."
+
+
 def _escape_pathname(s):
     """Remove fishy characters, replace most with dots"""
-    # Remove all whitespace completely
-    s = re.sub(r"\s+", "", s)
+    # Remove all whitespace completely, replace runs of bad characters and dots with a single dot
+    # (and no leading or trailing dot)
+    s = s.translate(_ASCII_WHITESPACE_TABLE)
+    if not _NON_ASCII_RE.search(s):
+        # no whitespace is left, so every run becomes a dot without calling back into python
+        return _SEPARATOR_RE.sub(".", s).strip(".")
+    return _SEPARATOR_RE.sub(_separator, s).strip(".")
 
-    # Replace bad characters with dots
-    blacklist = r"[^\.\-=_\w\d]+"
-    s = re.sub(blacklist, ".", s)
 
-    # Multiple dots -> single dot (and no leading or trailing dot)
-    s = re.sub(r"[\.]+", ".", s)
-    return re.sub(r"^\.|\.$", "", s)
+# formatters hold no per-logger state, so all test loggers share one
+_TEST_LOG_FORMATTER = logging.Formatter(ConsoleDefaults.TEST_LOG_FORMATTER)
 
 
 def test_logger(logger_name, log_dir, debug):
@@ -226,7 +242,8 @@ class TestLoggerMaker(LoggerMaker):
 
     def configure_logger(self):
         """Set up the logger to log to stdout and files.
-        This creates a directory and a few files as a side-effect.
+        This creates a directory as a side-effect. The log files in it are only created once something is logged
+        at their level.
         """
         if self.configured:
             return
@@ -235,13 +252,14 @@ class TestLoggerMaker(LoggerMaker):
         mkdir_p(self.log_dir)
 
         # Create info and debug level handlers to pipe to log files
-        info_fh = logging.FileHandler(os.path.join(self.log_dir, "test_log.info"))
-        debug_fh = logging.FileHandler(os.path.join(self.log_dir, "test_log.debug"))
+        # Files are only opened once something is logged to them, so idle loggers don't hold file descriptors
+        info_fh = logging.FileHandler(os.path.join(self.log_dir, "test_log.info"), delay=True)
+        debug_fh = logging.FileHandler(os.path.join(self.log_dir, "test_log.debug"), delay=True)
 
         info_fh.setLevel(logging.INFO)
         debug_fh.setLevel(logging.DEBUG)
 
-        formatter = logging.Formatter(ConsoleDefaults.TEST_LOG_FORMATTER)
+        formatter = _TEST_LOG_FORMATTER
         info_fh.setFormatter(formatter)
         debug_fh.setFormatter(formatter)
 
@@ -279,6 +297,8 @@ class TestContext(object):
         self.module = kwargs.get("module")
         self.test_suite_name = kwargs.get("test_suite_name")
 
+        # resolve eagerly: a relative path means relative to the working directory at load time, which may change
+        # before the path is used (see in_dir). copy() doesn't come through here, so this runs once per loaded test.
         if kwargs.get("file") is not None:
             self.file = os.path.abspath(kwargs.get("file"))
         else:
@@ -288,8 +308,11 @@ class TestContext(object):
         self.injected_args = kwargs.get("injected_args")
         self.ignore = kwargs.get("ignore", False)
 
-        # cluster_use_metadata is a dict containing information about how this test will use cluster resources
-        self.cluster_use_metadata = copy.copy(kwargs.get("cluster_use_metadata", {}))
+        # cluster_use_metadata is a dict containing information about how this test will use cluster resources.
+        # It is shared with the marks and copies it came from, so it is replaced rather than modified in place.
+        self.cluster_use_metadata = kwargs.get("cluster_use_metadata") or {}
+        # (num_nodes, ClusterSpec) pair, see expected_cluster_spec
+        self._num_nodes_cluster_spec = None
 
         self.services = ServiceRegistry()
         self.test_index = None
@@ -300,6 +323,11 @@ class TestContext(object):
         self._logger = None
         self._local_scratch_dir = None
 
+        # names derived from the fields above, computed on first use
+        self._injected_args_name = None
+        self._test_name = None
+        self._results_dir = None
+
     def __repr__(self):
         return \
             f"<module={self.module}, cls={self.cls_name}, function={self.function_name}, " \
@@ -310,7 +338,17 @@ class TestContext(object):
         """Construct a new TestContext object from another TestContext object
         Note that this is not a true copy, since a fresh ServiceRegistry instance will be created.
         """
-        ctx_copy = TestContext(**self.__dict__)
+        # copy the fields as they are rather than running them through __init__ again,
+        # then reset the per-run state and derived names
+        ctx_copy = copy.copy(self)
+        ctx_copy.services = ServiceRegistry()
+        ctx_copy.test_index = None
+        ctx_copy.log_collect = {}
+        ctx_copy._logger = None
+        ctx_copy._local_scratch_dir = None
+        ctx_copy._injected_args_name = None
+        ctx_copy._test_name = None
+        ctx_copy._results_dir = None
         ctx_copy.__dict__.update(**kwargs)
 
         return ctx_copy
@@ -341,6 +379,22 @@ class TestContext(object):
 
     @staticmethod
     def results_dir(test_context, test_index):
+        if isinstance(test_context, TestContext):
+            # everything but the test index is fixed for a given test context, so only join it once
+            if test_context._results_dir is None:
+                test_context._results_dir = TestContext._test_results_dir(test_context)
+            d = test_context._results_dir
+        else:
+            d = TestContext._test_results_dir(test_context)
+
+        if test_index is not None:
+            d = os.path.join(d, str(test_index))
+
+        return d
+
+    @staticmethod
+    def _test_results_dir(test_context):
+        """Results directory of the given test context, not including the test index"""
         d = test_context.session_context.results_dir
 
         if test_context.cls is not None:
@@ -349,8 +403,6 @@ class TestContext(object):
             d = os.path.join(d, test_context.function.__name__)
         if test_context.injected_args is not None:
             d = os.path.join(d, test_context.injected_args_name)
-        if test_index is not None:
-            d = os.path.join(d, str(test_index))
 
         return d
 
@@ -377,7 +429,10 @@ class TestContext(object):
         if cluster_spec is not None:
             return cluster_spec
         elif cluster_size is not None:
-            return ClusterSpec.simple_linux(cluster_size)
+            # this is looked up on every scheduling decision, so don't build a new spec each time
+            if self._num_nodes_cluster_spec is None or self._num_nodes_cluster_spec[0] != cluster_size:
+                self._num_nodes_cluster_spec = (cluster_size, ClusterSpec.simple_linux(cluster_size))
+            return self._num_nodes_cluster_spec[1]
         elif not self.cluster:
             return ClusterSpec.empty()
         elif self.session_context.fail_greedy_tests:
@@ -415,11 +470,13 @@ class TestContext(object):
 
     @property
     def injected_args_name(self):
-        if self.injected_args is None:
-            return ""
-        else:
-            params = ".".join(["%s=%s" % (k, self.injected_args[k]) for k in self.injected_args])
-            return _escape_pathname(params)
+        if self._injected_args_name is None:
+            if self.injected_args is None:
+                self._injected_args_name = ""
+            else:
+                params = ".".join(["%s=%s" % (k, self.injected_args[k]) for k in self.injected_args])
+                self._injected_args_name = _escape_pathname(params)
+        return self._injected_args_name
 
     @property
     def test_id(self):
@@ -431,12 +488,15 @@ class TestContext(object):
         The fully-qualified name of the test. This is similar to test_id, but does not include the session ID. It
         includes the module, class, and method name.
         """
-        name_components = [self.module_name,
-                           self.cls_name,
-                           self.function_name,
-                           self.injected_args_name]
-
-        return ".".join(filter(lambda x: x is not None and len(x) > 0, name_components))
+        if self._test_name is None:
+            name_components = [self.module_name,
+                               self.cls_name,
+                               self.function_name,
+                               self.injected_args_name]
+
+            # none of the components are None, so only the empty ones need to be left out
+            self._test_name = ".".join([c for c in name_components if c])
+        return self._test_name
 
     @property
     def logger(self):
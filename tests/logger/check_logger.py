@@ -19,6 +19,7 @@ import shutil
 import tempfile
 
 from ducktape.tests.loggermaker import LoggerMaker, close_logger
+from ducktape.tests.test import test_logger
 
 
 class DummyFileLoggerMaker(LoggerMaker):
@@ -60,6 +61,28 @@ class CheckLogger(object):
         close_logger(the_logger)
         assert len(open_files()) == len(initial_open_files)
 
+    def check_test_logger_opens_files_lazily(self):
+        """Check that the test log files are only opened once something is logged to them."""
+        initial_open_files = open_files()
+        info_log = os.path.join(self.temp_dir, "test_log.info")
+        debug_log = os.path.join(self.temp_dir, "test_log.debug")
+
+        the_logger = test_logger("check_logger.lazy", self.temp_dir, debug=False)
+        assert len(open_files()) == len(initial_open_files)
+        assert not os.path.exists(info_log)
+        assert not os.path.exists(debug_log)
+
+        the_logger.debug("debug message")
+        assert not os.path.exists(info_log)
+        assert os.path.exists(debug_log)
+
+        the_logger.info("info message")
+        assert os.path.exists(info_log)
+        assert len(open_files()) == len(initial_open_files) + 2
+
+        close_logger(the_logger)
+        assert len(open_files()) == len(initial_open_files)
+
     def teardown_method(self, _):
         if os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir)
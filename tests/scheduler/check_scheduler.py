@@ -15,12 +15,34 @@
 
 import collections
 
-from ducktape.cluster.cluster_spec import ClusterSpec
+import pytest
+
+from ducktape.cluster.cluster_spec import ClusterSpec, NodeSpec, LINUX, WINDOWS
 from tests.ducktape_mock import FakeCluster
-from ducktape.tests.scheduler import TestScheduler
+from ducktape.tests.scheduler import TestScheduler, BEST_FIT, SCHEDULER_POLICIES
 from ducktape.services.service import Service
 
-FakeContext = collections.namedtuple('FakeContext', ['test_id', 'expected_num_nodes', 'expected_cluster_spec'])
+FakeContext = collections.namedtuple(
+    'FakeContext', ['test_id', 'expected_num_nodes', 'expected_cluster_spec', 'module_name', 'cls_name'])
+FakeContext.__new__.__defaults__ = ("", "")
+
+
+class GreedyContext(object):
+    """Stand-in for a test without cluster use metadata, which claims the whole cluster"""
+
+    def __init__(self, test_id, cluster):
+        self.test_id = test_id
+        self.cluster = cluster
+        self.module_name = ""
+        self.cls_name = ""
+
+    @property
+    def expected_cluster_spec(self):
+        return self.cluster.all()
+
+    @property
+    def expected_num_nodes(self):
+        return self.expected_cluster_spec.size()
 
 
 class CheckScheduler(object):
@@ -118,3 +140,135 @@ class CheckScheduler(object):
         # subsequent calls should return empty list and not modify scheduler
         assert not scheduler.filter_unschedulable_tests()
         assert scheduler.peek() == self.tc0
+
+    def check_remove_out_of_order(self):
+        """Removing tests in arbitrary order should keep the scheduler ordering and size consistent."""
+        tc3 = FakeContext(3, expected_num_nodes=50, expected_cluster_spec=ClusterSpec.simple_linux(50))
+        scheduler = TestScheduler(self.tc_list + [tc3], self.cluster)
+
+        scheduler.remove(tc3)
+        assert len(scheduler) == 3
+        scheduler.remove(self.tc2)
+        assert len(scheduler) == 2
+        assert scheduler.peek() == self.tc1
+
+        # removing a test which is no longer in the scheduler is an error
+        with pytest.raises(ValueError):
+            scheduler.remove(tc3)
+
+        scheduler.remove(self.tc1)
+        assert scheduler.peek() == self.tc0
+        scheduler.remove(self.tc0)
+        assert len(scheduler) == 0
+        assert scheduler.peek() is None
+
+    def check_remove_smaller_tests_first(self):
+        """Removing the smaller tests first should not affect which tests are offered up next."""
+        tcs = [FakeContext(i, expected_num_nodes=1 + i % 2, expected_cluster_spec=ClusterSpec.simple_linux(1 + i % 2))
+               for i in range(8)]
+        scheduler = TestScheduler(tcs, self.cluster)
+
+        for test_id in [0, 2, 4]:
+            tc = scheduler.peek(available=ClusterSpec.simple_linux(1))
+            assert tc.test_id == test_id
+            scheduler.remove(tc)
+        assert scheduler.peek(available=ClusterSpec.simple_linux(1)).test_id == 6
+        assert scheduler.peek(available=ClusterSpec.simple_linux(2)).test_id == 1
+
+        scheduler.remove(tcs[6])
+        assert scheduler.peek(available=ClusterSpec.simple_linux(1)) is None
+        assert len(scheduler) == 4
+
+    def check_peek_with_available(self):
+        """peek() should use the given available nodes rather than querying the cluster."""
+        scheduler = TestScheduler(self.tc_list, self.cluster)
+
+        assert scheduler.peek(available=ClusterSpec.simple_linux(60)) == self.tc1
+        assert scheduler.peek(available=ClusterSpec.simple_linux(5)) is None
+        assert scheduler.peek(available=ClusterSpec.empty()) is None
+        assert scheduler.peek() == self.tc2
+
+    def check_best_fit(self):
+        """The best-fit policy should prefer, among equally sized tests, the one matching the plentiful node types."""
+        windows_tc = FakeContext(3, expected_num_nodes=4, expected_cluster_spec=ClusterSpec([NodeSpec(WINDOWS)] * 4))
+        linux_tc = FakeContext(4, expected_num_nodes=4, expected_cluster_spec=ClusterSpec.simple_linux(4))
+        available = ClusterSpec([NodeSpec(LINUX)] * 6 + [NodeSpec(WINDOWS)] * 4)
+
+        scheduler = TestScheduler([windows_tc, linux_tc, self.tc0], self.cluster)
+        assert scheduler.peek(available=available) == windows_tc
+
+        scheduler = TestScheduler([windows_tc, linux_tc, self.tc0], self.cluster, policy=BEST_FIT)
+        assert scheduler.peek(available=available) == linux_tc
+        assert scheduler.peek(available=ClusterSpec([NodeSpec(WINDOWS)] * 4)) == windows_tc
+        assert scheduler.peek(available=ClusterSpec.simple_linux(20)) == self.tc0
+        assert scheduler.peek(available=ClusterSpec.simple_linux(3)) is None
+
+    def check_unsupported_policy(self):
+        with pytest.raises(RuntimeError):
+            TestScheduler(self.tc_list, self.cluster, policy="smallest")
+
+    def check_drain_in_order(self):
+        """Draining the scheduler should offer tests from largest to smallest, keeping the order of equal sizes."""
+        tcs = [FakeContext(i, expected_num_nodes=i % 3, expected_cluster_spec=ClusterSpec.simple_linux(i % 3))
+               for i in range(12)]
+        scheduler = TestScheduler(tcs, self.cluster)
+
+        drained = []
+        while len(scheduler) > 0:
+            tc = scheduler.peek()
+            scheduler.remove(tc)
+            drained.append(tc.test_id)
+        assert drained == [2, 5, 8, 11, 1, 4, 7, 10, 0, 3, 6, 9]
+        assert scheduler.peek() is None
+
+    def check_group_by_module_and_class(self):
+        """Equally sized tests from the same module and class should be offered up next to each other."""
+        tcs = [FakeContext(i, expected_num_nodes=i // 6, expected_cluster_spec=ClusterSpec.simple_linux(i // 6),
+                           module_name="module%d" % (i % 2), cls_name="Class%d" % (i % 4 // 2))
+               for i in range(12)]
+        # the runner filters the tests before running them, which must not change the order of the groups
+        tcs.insert(0, FakeContext(12, expected_num_nodes=0, expected_cluster_spec=ClusterSpec.empty(),
+                                  module_name="module2", cls_name="Class0"))
+        scheduler = TestScheduler(tcs, self.cluster)
+        assert not scheduler.filter_unschedulable_tests()
+
+        drained = []
+        while len(scheduler) > 0:
+            tc = scheduler.peek()
+            scheduler.remove(tc)
+            drained.append(tc.test_id)
+        assert drained == [8, 9, 6, 10, 7, 11, 12, 0, 4, 1, 5, 2, 3]
+
+    @pytest.mark.parametrize("policy", SCHEDULER_POLICIES)
+    def check_cluster_shrinks_after_filter(self, policy):
+        """Tests claiming the whole cluster should still be offered up after the cluster loses nodes."""
+        cluster = FakeCluster(4)
+        large = FakeContext("large", expected_num_nodes=4, expected_cluster_spec=ClusterSpec.simple_linux(4))
+        greedy = GreedyContext("greedy", cluster)
+        small = FakeContext("small", expected_num_nodes=1, expected_cluster_spec=ClusterSpec.simple_linux(1))
+        scheduler = TestScheduler([large, greedy, small], cluster, policy=policy)
+        assert not scheduler.filter_unschedulable_tests()
+
+        # a node failing its health check is dropped from the cluster, without filtering the tests again
+        cluster._available_nodes.remove_spec(ClusterSpec.simple_linux(1))
+
+        drained = []
+        tc = scheduler.peek()
+        while tc is not None:
+            scheduler.remove(tc)
+            drained.append(tc.test_id)
+            tc = scheduler.peek()
+        assert drained == ["greedy", "small"]
+        assert len(scheduler) == 1
+
+    @pytest.mark.parametrize("policy", SCHEDULER_POLICIES)
+    def check_remove_after_cluster_shrinks(self, policy):
+        """A test claiming the whole cluster should be found for removal after the cluster loses nodes."""
+        cluster = FakeCluster(4)
+        greedy = GreedyContext("greedy", cluster)
+        scheduler = TestScheduler(self.tc_list + [greedy], cluster, policy=policy)
+        assert set(scheduler.filter_unschedulable_tests()) == set(self.tc_list)
+
+        cluster._available_nodes.remove_spec(ClusterSpec.simple_linux(1))
+        scheduler.remove(greedy)
+        assert len(scheduler) == 0
@@ -71,6 +71,16 @@ class CheckEscapePathname(object):
         path = "..a.....b.c...d."
         assert _escape_pathname(path) == "a.b.c.d"
 
+    def check_whitespace_between_dots(self):
+        # whitespace is dropped before runs of dots are collapsed
+        path = "a . ,b c\t"
+        assert _escape_pathname(path) == "a.bc"
+
+    def check_unicode_whitespace(self):
+        # non-ASCII whitespace is dropped as well, and non-ASCII word characters are kept
+        path = "a=\u00e9,\u00a0b=\u3000c"
+        assert _escape_pathname(path) == "a=\u00e9.b=c"
+
 
 class CheckDescription(object):
     """Check that pulling a description from a test works as expected."""
@@ -12,15 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from ducktape.tests.test import Test
+from ducktape.tests.test import Test, TestContext, in_temp_dir
 from ducktape.services.service import Service
 from ducktape.mark import parametrize
 from ducktape.mark.mark_expander import MarkedFunctionExpander
+from ducktape.mark.resource import CLUSTER_SIZE_KEYWORD
 
 from tests.ducktape_mock import session_context
 
 from mock import MagicMock
 
+import os
+from types import SimpleNamespace
+
 
 class CheckTestContext(object):
     def check_copy_constructor(self):
@@ -42,6 +46,59 @@ class CheckTestContext(object):
         # Ensure that each context.services object is a unique reference
         assert len(set(id(ctx.services) for ctx in ctx_list)) == len(ctx_list)
 
+    def check_expected_cluster_spec_reused(self):
+        """The cluster spec built from num_nodes should be reused, and rebuilt if the metadata changes."""
+        ctx = TestContext(session_context=session_context(), cluster=MagicMock(),
+                          cluster_use_metadata={CLUSTER_SIZE_KEYWORD: 3})
+        cluster_spec = ctx.expected_cluster_spec
+        assert cluster_spec.size() == 3
+        assert ctx.expected_cluster_spec is cluster_spec
+
+        ctx.cluster_use_metadata = {CLUSTER_SIZE_KEYWORD: 5}
+        assert ctx.expected_num_nodes == 5
+
+    def check_cluster_use_metadata_replaced_in_copy(self):
+        """Copies share the cluster use metadata until it is replaced on one of them."""
+        ctx = TestContext(session_context=session_context(), cluster=MagicMock(),
+                          cluster_use_metadata={CLUSTER_SIZE_KEYWORD: 3})
+        ctx_copy = ctx.copy()
+        assert ctx_copy.cluster_use_metadata is ctx.cluster_use_metadata
+
+        ctx_copy = ctx.copy(cluster_use_metadata={CLUSTER_SIZE_KEYWORD: 5})
+        assert ctx_copy.expected_num_nodes == 5
+        assert ctx.expected_num_nodes == 3
+
+    def check_copy_names(self):
+        """Names computed for a test context should not leak into copies with different injected args."""
+        ctx = TestContext(session_context=session_context(), module="a.b", cls=DummyTest,
+                          function=DummyTest.test_me, injected_args={"x": 1})
+        assert ctx.test_id == "a.b.DummyTest.test_me.x=1"
+        results_dir = os.path.join(ctx.session_context.results_dir, "DummyTest", "test_me")
+        assert TestContext.results_dir(ctx, 3) == os.path.join(results_dir, "x=1", "3")
+
+        ctx_copy = ctx.copy(injected_args={"x": 2})
+        assert ctx_copy.injected_args_name == "x=2"
+        assert ctx_copy.test_id == "a.b.DummyTest.test_me.x=2"
+        assert TestContext.results_dir(ctx_copy, None) == os.path.join(results_dir, "x=2")
+        assert ctx.test_id == "a.b.DummyTest.test_me.x=1"
+        assert TestContext.results_dir(ctx, None) == os.path.join(results_dir, "x=1")
+
+    def check_results_dir_of_stand_in(self):
+        """results_dir should still accept objects which only look like a test context."""
+        stand_in = SimpleNamespace(session_context=SimpleNamespace(results_dir="results"), cls=DummyTest,
+                                   function=DummyTest.test_me, injected_args={"x": 1}, injected_args_name="x=1")
+        assert TestContext.results_dir(stand_in, 2) == os.path.join("results", "DummyTest", "test_me", "x=1", "2")
+
+        stand_in.injected_args = None
+        assert TestContext.results_dir(stand_in, None) == os.path.join("results", "DummyTest", "test_me")
+
+    def check_file_resolved_at_construction(self):
+        """A relative file path should be resolved against the working directory when the context is created."""
+        with in_temp_dir() as tmpdir:
+            ctx = TestContext(session_context=session_context(), file="test_file.py")
+        assert ctx.file == os.path.join(os.path.realpath(tmpdir), "test_file.py")
+        assert ctx.copy(function=DummyTest.test_me).file == ctx.file
+
 
 class DummyTest(Test):
     def __init__(self, test_context):